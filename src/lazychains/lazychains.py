@@ -1,4 +1,6 @@
-from typing import TypeVar, Generic, Tuple, Union, Any
+import sys
+from typing import TypeVar, Generic, Deque, Tuple, Union, Any
+from collections import deque
 from collections.abc import Iterable, Iterator
 
 T = TypeVar('T')
@@ -33,18 +35,33 @@ class Chain(Generic[T]):
 
     # Implementation note: the _back field is used to represent different 
     # states of the chain. This implementation technique, borrowed from the
-    # implementation of dynamic lists in Poplog, requires only 2 fields and
-    # has the advantage of overwriting unwanted references to the iterator, 
-    # which therefore is released as soon as the chain is fully expanded.
+    # implementation of dynamic lists in Poplog, requires only 2 fields to
+    # encode the state and has the advantage of overwriting unwanted 
+    # references to the iterator, which therefore is released as soon as the
+    # chain is fully expanded.
     #
     #   True - this is an unexpanded node with the _front being the iterator
     #   Ellipsis - this is an unexpanded node with the _front being a deferred call
     #   False - this is an expanded _empty_ node, the front is ignored
     #   Chain - this is an expended _nonempty_ node, the front is the value
     #
+    # So a node is expanded and nonempty exactly when isinstance(_back, Chain),
+    # which is a single test where the tags would need three.
+    #
     # It is an key fact that after bool(mychain) tests positive, it is safe to 
     # use _front/_back as synonyms for head()/tail(). Within the class this is 
-    # used pervasively to avoid the overhead of a method call.
+    # used pervasively to avoid the overhead of a method call. The traversal
+    # loops go one step further and inspect _back directly, only falling back
+    # on bool() when they meet an unexpanded node.
+    #
+    # The optional _len field caches the length of a chain once it has been
+    # fully expanded. Expanded chains never change, so the cache never needs
+    # to be invalidated. Methods that complete a full walk record it on the
+    # node they were called on, and methods that only need the length consult
+    # it before walking. Note that this is paid for with an extra field on 
+    # every node, even though typically only the head of a chain ever uses it.
+
+    __slots__ = ( '_front', '_back', '_len', '__weakref__' )
 
     def __init__( self, head, tail ):
         """Private constructor
@@ -52,34 +69,52 @@ class Chain(Generic[T]):
         """
         self._front = head
         self._back = tail
+        self._len: Union[int, None] = None
 
     def __bool__( self ) -> bool:
         """
         True if the chain has any members, otherwise False. Will expand
         this chain node if required.
         """
-        while True:
-            if self._back is True:
-                try:
-                    item = next( self._front )
-                    c: Chain[T] = Chain( self._front, True )
-                    self._front = item
-                    self._back = c
-                except StopIteration:
-                    self._back = False
-                    self._front = None
-                    break
-            elif self._back is Ellipsis:
-                c = self._front()
-                if isinstance( c, Chain ):
-                    self._front = c._front
-                    self._back = c._back
-                else:
-                    raise Exception(f"Lazycall did not return a chain: {c}")
-            else:
-                break
-
-        return self._back is not False
+        back = self._back
+        if back is True:
+            it = self._front
+            try:
+                item = next( it )
+            except StopIteration:
+                self._back = False
+                self._front = None
+                return False
+            c: Chain[T] = Chain( it, True )
+            self._front = item
+            self._back = c
+            return True
+        elif back is Ellipsis:
+            # Resolve any chain of deferred calls before touching this node
+            # and memoise the outcome into each intermediate, so that a 
+            # shared deferred call is only ever forced once.
+            c = self._front()
+            pending = None
+            while isinstance( c, Chain ) and c._back is Ellipsis:
+                if pending is None:
+                    pending = []
+                pending.append( c )
+                c = c._front()
+            if not isinstance( c, Chain ):
+                raise Exception(f"Lazycall did not return a chain: {c}")
+            if c._back is True:
+                # Expand the result in place rather than copy its iterator,
+                # otherwise both nodes would draw items from it.
+                bool( c )
+            front = c._front
+            back = c._back
+            if pending is not None:
+                for d in pending:
+                    d._front = front
+                    d._back = back
+            self._front = front
+            self._back = back
+        return back is not False
 
     def is_expanded( self ) -> bool:
         """
@@ -99,7 +134,7 @@ class Chain(Generic[T]):
         """
         c = self
         n = 0
-        while c.is_expanded() and c:
+        while isinstance( c._back, Chain ):
             c = c._back
             n += 1
         return n
@@ -131,6 +166,9 @@ class Chain(Generic[T]):
         efficent - but more importantly it often makes the code easier to
         read.
         """
+        b = self._back
+        if b is not True and b is not Ellipsis and b is not False:
+            return self._front, b
         if self:
             return self._front, self._back
         else:
@@ -158,7 +196,7 @@ class Chain(Generic[T]):
         returns a Chain rather than an iterable. If you only need an iterable
         returned just do this: map( f, chain, \*iterables )
         """
-        return lazychain( map( f, self, *iterables ) )
+        return Chain( map( f, self, *iterables ), True )
 
     def filter( self, predicate ):
         """
@@ -166,7 +204,7 @@ class Chain(Generic[T]):
         returns a Chain rather than an iterable. If you only need an iterable
         returned just do this: filter( f, chain )
         """
-        return lazychain( filter( predicate, self ) )
+        return Chain( filter( predicate, self ), True )
 
     def zip( self, *iterables, strict=False ):
         r"""
@@ -174,17 +212,24 @@ class Chain(Generic[T]):
         returns a Chain of tuples rather than an iterable of tuples. If you only 
         need an iterable returned just do this: zip( chain, \*iterables, strict )
         """
-        return lazychain( zip( self, *iterables, strict=strict ) )
+        return Chain( zip( self, *iterables, strict=strict ), True )
 
     def __iter__( self ):
         """
         Returns an iterator over all the items in the chain. This will 
         gradually expand the underlying chain.
         """
-        _chain = self
-        while _chain:
-            yield _chain._front
-            _chain = _chain._back
+        c = self
+        while True:
+            b = c._back
+            if b is True or b is Ellipsis:
+                if not c:
+                    return
+                b = c._back
+            elif b is False:
+                return
+            yield c._front
+            c = b
 
     def __len__( self ) -> int:
         """
@@ -192,11 +237,21 @@ class Chain(Generic[T]):
         the expansion of the whole chain. If the chain is infinite this will
         not terminate!
         """
+        if self._len is not None:
+            return self._len
         c = self
         n = 0
-        while c:
+        while True:
+            b = c._back
+            if b is True or b is Ellipsis:
+                if not c:
+                    break
+                b = c._back
+            elif b is False:
+                break
             n += 1
-            c = c._back
+            c = b
+        self._len = n
         return n
 
     def len_is_at_least( self, n:int ) -> bool:
@@ -204,11 +259,18 @@ class Chain(Generic[T]):
         Returns True if the chain is at least n items in length. This avoids
         expanding the whole chain. Otherwise returns False.
         """
+        if self._len is not None:
+            return self._len >= n
         c = self
         while n > 0:
-            if not c:
+            b = c._back
+            if b is True or b is Ellipsis:
+                if not c:
+                    return False
+                b = c._back
+            elif b is False:
                 return False
-            c = c._back
+            c = b
             n -= 1
         return True
 
@@ -217,7 +279,21 @@ class Chain(Generic[T]):
         Returns True if the chain is more than n in length. This avoids
         expanding the whole chain. Otherwise returns False.
         """
-        return self.len_is_at_least( n + 1)
+        if self._len is not None:
+            return self._len > n
+        c = self
+        n += 1
+        while n > 0:
+            b = c._back
+            if b is True or b is Ellipsis:
+                if not c:
+                    return False
+                b = c._back
+            elif b is False:
+                return False
+            c = b
+            n -= 1
+        return True
 
     def len_is_at_most( self, n:int ) -> bool:
         """
@@ -235,22 +311,59 @@ class Chain(Generic[T]):
 
     def __contains__( self, x:T ) -> bool:
         """
-        Returns True if x is an element of the Chain, otherwise False.
+        Returns True if x is an element of the Chain, otherwise False. As
+        with the built-in containers, items are compared by identity before
+        falling back on equality.
         """
         c = self
-        while c:
-            if c._front == x:
+        while True:
+            b = c._back
+            if b is True or b is Ellipsis:
+                if not c:
+                    return False
+                b = c._back
+            elif b is False:
+                return False
+            v = c._front
+            if v is x or v == x:
                 return True
-            c = c._back
-        return False
+            c = b
 
     def expand( self ):
         """
         Force the expansion of the chain, returning the chain.
         """
+        if self._len is not None:
+            return self
         c = self
-        while c:
-            c = c._back
+        n = 0
+        while True:
+            b = c._back
+            if b is True:
+                # Run the iterator to exhaustion in a tight loop, rather than
+                # going through bool() for every node. Each item is linked in
+                # before the next one is requested, so the iterator may read 
+                # earlier items of its own chain. If it raises, the current 
+                # node is left unexpanded, exactly as bool() would leave it.
+                it = c._front
+                for x in it:
+                    d: Chain[T] = Chain( it, True )
+                    c._front = x
+                    c._back = d
+                    c = d
+                    n += 1
+                c._front = None
+                c._back = False
+                break
+            elif b is Ellipsis:
+                if not c:
+                    break
+                b = c._back
+            elif b is False:
+                break
+            n += 1
+            c = b
+        self._len = n
         return self
 
     def __add__( self, it: Iterable[T] ) -> 'Chain[T]':
@@ -261,14 +374,20 @@ class Chain(Generic[T]):
         """
         if not isinstance( it, Chain ):
             it = Chain( iter(it), True )
+        items = []
         c = self
-        r: Chain[T] = Chain( None, False )
-        while c:
-            r = Chain( c._front, r )
-            c = c._back
-        while r:
-            it = Chain( r._front, it )
-            r = r._back
+        while True:
+            b = c._back
+            if b is True or b is Ellipsis:
+                if not c:
+                    break
+                b = c._back
+            elif b is False:
+                break
+            items.append( c._front )
+            c = b
+        for x in reversed( items ):
+            it = Chain( x, it )
         return it
 
     def __getitem__( self, n:int ):
@@ -279,28 +398,55 @@ class Chain(Generic[T]):
         then an exception is raised.
 
         Negative indexes are accepted and have the usual meaning of indexing
-        from the end. Because this involves calculating the length of the chain,
-        it is inherently slow and obviously unsafe on infinite or extremely long
+        from the end. Because this involves traversing the whole chain, it is
+        inherently slow and obviously unsafe on infinite or extremely long 
         chains.
         """
         if n >= 0:
             c = self
             k = n
-            while k > 0:
-                if c:
-                    k -= 1
-                    c = c._back
-                else:
+            while True:
+                b = c._back
+                if b is True or b is Ellipsis:
+                    if not c:
+                        break
+                    b = c._back
+                elif b is False:
                     break
-            if c:
-                return c._front
-            else:
-                raise IndexError(f'Index is out of bounds for chain: {n}') 
+                if k == 0:
+                    return c._front
+                k -= 1
+                c = b
+            raise IndexError(f'Index is out of bounds for chain: {n}') 
         elif n < 0:
-            L = len( self )
-            idx = L + n
-            if idx >= 0:
-                return self.__getitem__( idx )
+            if self._len is not None:
+                idx = self._len + n
+                if idx >= 0:
+                    return self.__getitem__( idx )
+                else:
+                    raise IndexError(f'Negative index is out of bounds for chain: {n}')
+            if -n > sys.maxsize:
+                # No chain can be this long and deque would reject the maxlen.
+                raise IndexError(f'Negative index is out of bounds for chain: {n}')
+            # A single pass that keeps just the last -n items, caching the 
+            # length as it goes.
+            window: Deque[T] = deque( maxlen=-n )
+            c = self
+            L = 0
+            while True:
+                b = c._back
+                if b is True or b is Ellipsis:
+                    if not c:
+                        break
+                    b = c._back
+                elif b is False:
+                    break
+                window.append( c._front )
+                L += 1
+                c = b
+            self._len = L
+            if len( window ) == -n:
+                return window[0]
             else:
                 raise IndexError(f'Negative index is out of bounds for chain: {n}')
         else:
@@ -309,10 +455,10 @@ class Chain(Generic[T]):
     def __repr__( self ):
         items = []
         c = self
-        while c.is_expanded() and c:
+        while isinstance( c._back, Chain ):
             items.append( repr( c._front ) )
             c = c._back
-        if not c.is_expanded():
+        if c._back is not False:
             items.append('...')    
         return f"chain([{','.join(items)}])"
 
@@ -323,24 +469,37 @@ share a single empty chain where possible. NIL points the value we reuse.
 """
 NIL: Chain[Any] = Chain( None, False )
 
-def lazychain( it:Iterable[T]=() ) -> Chain[T]:
+class _Unset:
+    """
+    Marks an omitted argument without asking the caller's iterable to compare
+    itself with anything. It prints as the empty tuple it stands in for, which
+    keeps the generated documentation readable.
+    :meta private:
+    """
+
+    def __repr__( self ):
+        return '()'
+
+_UNSET: Any = _Unset()
+
+def lazychain( it:Iterable[T]=_UNSET ) -> Chain[T]:
     """
     Returns an unexpanded chain based on the iterable/iterator. Using this
     constructor allows you to work with very large or even infinite chains.
     Note that because this is lazy, subsequent changes to the underlying 
     iterable maybe incorporated into the chain.
     """
-    if it == ():
+    if it is _UNSET:
         return NIL
     return Chain( iter(it), True )
 
-def chain( it:Iterable[T]=() ) -> Chain[T]:
+def chain( it:Iterable[T]=_UNSET ) -> Chain[T]:
     """
     Returns a fully expanded chain based on the iterable/iterator. This is 
     useful when you need the chain to be independent of changes in the 
     underlying iterable.
     """
-    if it == ():
+    if it is _UNSET:
         return NIL
     return lazychain( it ).expand()
 
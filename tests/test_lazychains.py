@@ -193,8 +193,10 @@ def test_len_is_at_least():
     # Assert
     assert c.len_is_at_least(0) and c.len_is_at_least(5)
     assert not c.len_is_at_least(6) and not c.len_is_at_least(9999999)
+    d = chain( "abxyz" )
+    assert d.len_is_at_least(5) and not d.len_is_at_least(6)
 
-def len_is_more_than():
+def test_len_is_more_than():
     # Arrange
     c = lazychain( "abxyz" )
     # Assert
@@ -233,7 +235,7 @@ def test_expand():
     assert d is c
     assert 5 == c.expanded_len()
 
-def test_add():
+def test_add_to_self():
     # Arrange
     sample = "abxyz"
     c = lazychain( sample )
@@ -252,3 +254,163 @@ def test_lazycall():
         return t.filter( lambda x: x % p != 0 ).lazycall( sieve ).new( p )
     primes = sieve( lazychain( itertools.count(2) ) )
     assert [2,3,5,7,11,13,17,19,23,29,31,37] == list( itertools.islice( primes, 12 ) )
+
+def test_nodes_are_compact():
+    # Arrange
+    c = chain( "abc" )
+    # Assert
+    assert not hasattr( c, '__dict__' )
+    assert not hasattr( c.tail(), '__dict__' )
+
+def test_weak_references():
+    # Arrange
+    import weakref
+    c = chain( "a" )
+    # Act
+    r = weakref.ref( c )
+    # Assert
+    assert r() is c
+
+def test_in_uses_identity():
+    # Arrange
+    nan = float( 'nan' )
+    c = lazychain( [ 1, nan, 2 ] )
+    # Assert
+    assert nan in c
+    assert float( 'nan' ) not in c
+
+def test_len_is_cached():
+    # Arrange
+    c = lazychain( "abxyz" )
+    # Act
+    n = len( c )
+    d = c.new( "w" )
+    # Assert
+    assert 5 == n and 5 == len( c )
+    assert 6 == len( d )
+    assert "z" == c[-1] and "a" == c[-5]
+    assert 5 == len( chain( "abxyz" ) )
+    # The length is recorded on the nodes that were measured and repeated
+    # calls leave the chain untouched.
+    assert c._len == 5 and d._len == 6
+    assert 5 == c.expanded_len()
+
+def test_nested_lazycall_is_forced_once():
+    # Arrange
+    calls = []
+    def count_down( L, n ):
+        calls.append( n )
+        if n == 0:
+            return lazychain( "ab" )
+        return L.lazycall( count_down, n - 1 )
+    inner = lazychain().lazycall( count_down, 2 )
+    outer = lazychain().lazycall( lambda L: inner )
+    # Act
+    x = list( outer )
+    y = list( inner )
+    # Assert
+    assert [ "a", "b" ] == x == y
+    assert [ 2, 1, 0 ] == calls
+    assert outer.tail() is inner.tail()
+
+def test_construction_does_not_compare_iterable():
+    # Arrange
+    class NoCompare:
+        def __eq__( self, other ):
+            raise TypeError( 'Not comparable' )
+        def __iter__( self ):
+            return iter( "ab" )
+    # Act
+    lc = lazychain( NoCompare() )
+    sc = chain( NoCompare() )
+    # Assert
+    assert [ "a", "b" ] == list( lc ) == list( sc )
+
+def test_default_argument_is_readable():
+    # Arrange
+    import inspect
+    # Assert
+    assert "= ()" in str( inspect.signature( lazychain ) )
+    assert "= ()" in str( inspect.signature( chain ) )
+
+def test_expand_keeps_items_before_error():
+    # Arrange
+    def items():
+        yield "a"
+        yield "b"
+        raise ValueError( 'Oops' )
+    c = lazychain( items() )
+    # Act
+    try:
+        c.expand()
+    except ValueError:
+        pass
+    # Assert
+    assert 2 == c.expanded_len()
+    assert [ "a", "b" ] == [ c[0], c[1] ]
+
+def test_getitem_out_of_bounds():
+    # Arrange
+    c = lazychain( "abc" )
+    # Assert
+    assert "c" == c[2]
+    for n in ( 3, 99 ):
+        try:
+            c[n]
+            assert False
+        except IndexError:
+            pass
+
+def test_negative_getitem():
+    # Arrange
+    c = lazychain( "abc" )
+    d = lazychain( "abc" )
+    # Act
+    len( d )
+    # Assert
+    assert "c" == c[-1] and "a" == c[-3]
+    assert "c" == d[-1] and "a" == d[-3]
+    for k in ( -4, -10**20 ):
+        for e in ( lazychain( "abc" ), d ):
+            try:
+                e[k]
+                assert False
+            except IndexError:
+                pass
+
+def test_repr():
+    # Arrange
+    c = lazychain( "abc" )
+    # Act
+    c[0]
+    # Assert
+    assert "chain(['a',...])" == repr( c )
+    assert "chain(['a','b','c'])" == repr( c.expand() )
+    assert "chain([])" == repr( chain() )
+
+def test_dest_fast_path():
+    # Arrange
+    c = lazychain( "ab" )
+    # Act
+    ( h, t ) = c.dest()
+    # Assert
+    assert "a" == h and t is c.tail()
+    assert ( "a", t ) == c.dest()
+    try:
+        chain().dest()
+        assert False
+    except Exception as e:
+        assert "empty" in str( e )
+
+def test_expand_self_referential_generator():
+    # Arrange
+    def doubling():
+        yield 1
+        for i in range( 5 ):
+            yield F[i] * 2
+    F = lazychain( doubling() )
+    # Act
+    F.expand()
+    # Assert
+    assert [ 1, 2, 4, 8, 16, 32 ] == list( F )
+    assert [ 1, 2, 4 ] == list( chain( x for x in ( 1, 2, 4 ) ) )